@@ -44,8 +44,24 @@ class Config:
     ])
     skill_timeout_seconds: int = 30
 
+    # Conversation history limits (older turns are dropped first)
+    max_history_turns: int = 20
+    max_history_tokens: int = 50_000
+
+# One Config per .env path — loading is done once per process
+_CONFIG_CACHE: dict[str | None, Config] = {}
+
 def load_config(env_path: str | None = None) -> Config:
-    """Load configuration from a .env file."""
+    """
+    Load configuration from a .env file.
+
+    The first call reads the file; later calls with the same path
+    return the same Config without touching disk again.
+    """
+    cached = _CONFIG_CACHE.get(env_path)
+    if cached is not None:
+        return cached
+
     # Load the .env file into environment variables
     load_dotenv(env_path or ".env")
 
@@ -59,6 +75,8 @@ def load_config(env_path: str | None = None) -> Config:
         slack_bot_token=os.getenv("SLACK_BOT_TOKEN", ""),
         slack_app_token=os.getenv("SLACK_APP_TOKEN", ""),
         skill_timeout_seconds=int(os.getenv("SKILL_TIMEOUT_SECONDS", "30")),
+        max_history_turns=int(os.getenv("MAX_HISTORY_TURNS", "20")),
+        max_history_tokens=int(os.getenv("MAX_HISTORY_TOKENS", "50000")),
     )
 
     # Parse the comma-separated auto-approve list
@@ -77,4 +95,9 @@ def load_config(env_path: str | None = None) -> Config:
             os.getenv("GMAIL_TOKEN_PATH", "./credentials/gmail_token.json")
         )
 
-    return config
\ No newline at end of file
+    _CONFIG_CACHE[env_path] = config
+    return config
+
+def reset_config():
+    """Forget cached configs so the next load_config() re-reads .env (for tests)."""
+    _CONFIG_CACHE.clear()
\ No newline at end of file
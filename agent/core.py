@@ -9,17 +9,23 @@ This module:
 5. Logs conversations to daily session files
 """
 
-import json
 import datetime
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
+from typing import Callable, TextIO
 
-import anthropic
+import orjson
 
 from agent.config import Config
+from agent.memory.embeddings import preload_model
 from agent.memory.loader import load_identity
 from agent.memory.store import MemoryStore
 from agent.skills.loader import SkillRegistry
 
+# Longest tool result we keep in the conversation history
+MAX_TOOL_RESULT_CHARS = 10_000
+
 class Agent:
     """
     The core agent. Create one, then call agent.chat("your message")
@@ -29,7 +35,12 @@ class Agent:
     def __init__(self, config: Config):
         self.config = config
 
-        # Create the Anthropic API client
+        # Start loading the embedding model while we set everything else up
+        preload_model()
+
+        # Create the Anthropic API client. Imported here so code that only
+        # needs Config (or other agent modules) doesn't pay for the SDK.
+        import anthropic
         self.client = anthropic.Anthropic(api_key=config.anthropic_api_key)
 
         # Initialize the memory system
@@ -41,18 +52,48 @@ class Agent:
         # Load identity files (SOUL.md, USER.md, MEMORY.md)
         self.identity = load_identity(config.memory_dir)
 
+        # Tool schemas never change, so build them once. The SDK doesn't
+        # mutate the list, so it's safe to pass the same one every call.
+        self._tools = self._build_tools()
+
+        # Cached system prompt: (date, skill descriptions, prompt).
+        # Only rebuilt when the day rolls over or the skills change.
+        self._prompt_cache: tuple[datetime.date, str, str] | None = None
+
         # Conversation history — this is what makes it multi-turn
         self.conversation_history: list[dict] = []
 
+        # Running size of the history (in characters), so we know when
+        # to prune without re-measuring every message each turn
+        self._history_chars = 0
+
+        # Optional hook: turn dropped messages into a short summary
+        self.history_summarizer: Callable[[list[dict]], str] | None = None
+
         # Ensure daily log directory exists
         daily_dir = config.memory_dir / "daily"
         daily_dir.mkdir(parents=True, exist_ok=True)
 
+        # Today's log file stays open between exchanges. Writes happen on
+        # a single background thread (one worker keeps entries in order),
+        # so disk I/O never delays the next API call. Call close() when
+        # done; otherwise queued writes are still finished at exit (the
+        # finalizer holds only the pool, so it doesn't keep us alive).
+        self._log_fh: TextIO | None = None
+        self._log_date: str | None = None
+        self._log_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="agent-log")
+        self._log_finalizer = weakref.finalize(self, self._log_pool.shutdown, wait=True)
+
     def build_system_prompt(self) -> str:
         """Build the system prompt that tells Claude who it is."""
+        today = datetime.date.today()
         skill_descriptions = self.skills.describe_all()
 
-        return f"""You are a personal AI agent. You act on behalf of your user.
+        cached = self._prompt_cache
+        if cached and cached[0] == today and cached[1] is skill_descriptions:
+            return cached[2]
+
+        prompt = f"""You are a personal AI agent. You act on behalf of your user.
 You have persistent memory and can learn over time.
 
 {self.identity}
@@ -76,10 +117,16 @@ You have these tools:
 - For risky actions (file writes, sending messages), explain what you'll do first.
 - Keep responses concise and actionable.
 
-Today is {datetime.date.today().isoformat()}.
+Today is {today.isoformat()}.
 """
+        self._prompt_cache = (today, skill_descriptions, prompt)
+        return prompt
     
     def get_tools(self) -> list[dict]:
+        """The tool schemas that Claude can call (built once, in __init__)."""
+        return self._tools
+
+    def _build_tools(self) -> list[dict]:
         """Define the tool schemas that Claude can call."""
         return [
             {
@@ -201,9 +248,13 @@ Today is {datetime.date.today().isoformat()}.
         # ── Permission Gate ──────────────────────────────
         if tool_name not in self.config.auto_approve_actions:
             if approval_callback:
+                payload = orjson.dumps(
+                    tool_input,
+                    option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS
+                ).decode()
                 description = (
                     f"Tool: {tool_name}\n"
-                    f"Input: {json.dumps(tool_input, indent=2)}"
+                    f"Input: {payload}"
                 )
                 approved = approval_callback(description)
                 if not approved:
@@ -211,7 +262,14 @@ Today is {datetime.date.today().isoformat()}.
             else:
                 return f"Action '{tool_name}' requires approval."
 
-        # ── Route to the right handler ────────────────────
+        # Results go into the history and are re-sent every turn, so cap them
+        result = self._route_tool_call(tool_name, tool_input)
+        if len(result) > MAX_TOOL_RESULT_CHARS:
+            result = result[:MAX_TOOL_RESULT_CHARS] + "\n…(truncated)"
+        return result
+
+    def _route_tool_call(self, tool_name: str, tool_input: dict) -> str:
+        """Route an (already approved) tool call to the right handler."""
         if tool_name == "search_memory":
             results = self.memory.search(
                 query=tool_input["query"],
@@ -220,7 +278,7 @@ Today is {datetime.date.today().isoformat()}.
             if not results:
                 return "No relevant memories found."
             return "\n\n".join(
-                f"[{r['category']}] (score: {r['score']:.2f}) {r['content']}"
+                f"[{r['category']}] (score: {r['score']:.3g}) {r['content']}"
                 for r in results
             )
 
@@ -236,7 +294,7 @@ Today is {datetime.date.today().isoformat()}.
             if not path.exists():
                 return f"File not found: {path}"
             try:
-                return path.read_text(encoding="utf-8")[:10000]
+                return path.read_text(encoding="utf-8")[:MAX_TOOL_RESULT_CHARS]
             except Exception as e:
                 return f"Error reading file: {e}"
 
@@ -267,13 +325,16 @@ Today is {datetime.date.today().isoformat()}.
     def chat(self, user_message: str, approval_callback=None) -> str:
         """Send a message to the agent and get a response."""
         # Add user message to conversation history
-        self.conversation_history.append({
+        self._append_history({
             "role": "user",
             "content": user_message
         })
 
+        # Drop the oldest turns if the history has grown too large
+        self._prune_history()
+
         system_prompt = self.build_system_prompt()
-        tools = self.get_tools()
+        tools = self._tools
 
         # ── The Agentic Loop ─────────────────────────────
         while True:
@@ -288,23 +349,22 @@ Today is {datetime.date.today().isoformat()}.
 
             # Add Claude's response to history
             assistant_content = response.content
-            self.conversation_history.append({
+            self._append_history({
                 "role": "assistant",
                 "content": assistant_content
             })
 
-            # Check: did Claude call any tools?
-            tool_use_blocks = [
-                block for block in assistant_content
-                if block.type == "tool_use"
-            ]
+            # Sort the blocks in one pass: tool calls vs. text
+            tool_use_blocks = []
+            text_blocks = []
+            for block in assistant_content:
+                if block.type == "tool_use":
+                    tool_use_blocks.append(block)
+                elif block.type == "text":
+                    text_blocks.append(block.text)
 
             # If NO tool calls → Claude is done, return the text
             if not tool_use_blocks:
-                text_blocks = [
-                    block.text for block in assistant_content
-                    if block.type == "text"
-                ]
                 final_response = "\n".join(text_blocks)
 
                 # Log this exchange
@@ -327,15 +387,62 @@ Today is {datetime.date.today().isoformat()}.
                 })
 
             # Add tool results to history and continue the loop
-            self.conversation_history.append({
+            self._append_history({
                 "role": "user",
                 "content": tool_results
             })
 
+    def _append_history(self, message: dict):
+        """Add a message to the history and update the running size."""
+        self.conversation_history.append(message)
+        self._history_chars += _message_size(message)
+
+    def _prune_history(self):
+        """
+        Keep the history within max_history_turns / max_history_tokens.
+
+        A "turn" starts at a plain user message. We only ever cut at turn
+        boundaries so tool_use / tool_result pairs stay together, and the
+        newest turn is always kept.
+        """
+        history = self.conversation_history
+        turn_starts = [
+            i for i, m in enumerate(history)
+            if m["role"] == "user" and isinstance(m["content"], str)
+        ]
+
+        drop = 0
+        dropped_chars = 0
+        turns = len(turn_starts)
+        while turns > 1 and (
+            turns > self.config.max_history_turns
+            or (self._history_chars - dropped_chars) // 4 > self.config.max_history_tokens
+        ):
+            next_start = turn_starts[len(turn_starts) - turns + 1]
+            dropped_chars += sum(_message_size(m) for m in history[drop:next_start])
+            drop = next_start
+            turns -= 1
+
+        if not drop:
+            return
+
+        dropped = history[:drop]
+        self.conversation_history = history[drop:]
+        self._history_chars -= dropped_chars
+
+        if self.history_summarizer:
+            summary = self.history_summarizer(dropped)
+            first = self.conversation_history[0]
+            merged = {
+                "role": "user",
+                "content": f"[Prior context summary]: {summary}\n\n{first['content']}"
+            }
+            self.conversation_history[0] = merged
+            self._history_chars += _message_size(merged) - _message_size(first)
+
     def _log_session(self, user_msg: str, agent_msg: str):
-        """Write this exchange to today's daily log."""
+        """Queue this exchange to be written to today's daily log."""
         today = datetime.date.today().isoformat()
-        log_path = self.config.memory_dir / "daily" / f"{today}.md"
 
         timestamp = datetime.datetime.now().strftime("%H:%M:%S")
         entry = (
@@ -345,11 +452,65 @@ Today is {datetime.date.today().isoformat()}.
             f"---\n"
         )
 
-        with open(log_path, "a", encoding="utf-8") as f:
-            if log_path.stat().st_size == 0:
-                f.write(f"# Session Log — {today}\n")
-            f.write(entry)
+        future = self._log_pool.submit(self._write_log, today, entry)
+        future.add_done_callback(_report_log_failure)
+
+    def _write_log(self, today: str, entry: str):
+        """Append an entry to the daily log (runs on the log thread)."""
+        log_path = self.config.memory_dir / "daily" / f"{today}.md"
+
+        # Switch to a new file when the day rolls over
+        if self._log_fh is None or self._log_date != today:
+            self._close_log()
+            self._log_fh = open(log_path, "a", encoding="utf-8")
+            self._log_date = today
+            if self._log_fh.tell() == 0:
+                self._log_fh.write(f"# Session Log — {today}\n")
+
+        self._log_fh.write(entry)
+        self._log_fh.flush()
+
+    def _close_log(self):
+        """Close the open daily log file (if any)."""
+        if self._log_fh is not None:
+            self._log_fh.close()
+            self._log_fh = None
+            self._log_date = None
+
+    def close(self):
+        """
+        Release the agent's resources: finish queued log writes, close
+        the log file and its thread, and close the memory database.
+        """
+        self._log_finalizer()  # shuts the log pool down (only the first time)
+        self._close_log()
+        self.memory.close()
 
     def reset_conversation(self):
         """Clear conversation history (start fresh)."""
-        self.conversation_history = []
\ No newline at end of file
+        self.conversation_history = []
+        self._history_chars = 0
+
+
+def _report_log_failure(future: Future):
+    """Warn when a background log write failed (it would be lost silently otherwise)."""
+    error = None if future.cancelled() else future.exception()
+    if error is not None:
+        print(f"⚠️  Failed to write the daily log: {error}")
+
+
+def _message_size(message: dict) -> int:
+    """Rough size of a history message in characters (~4 per token)."""
+    content = message["content"]
+    if isinstance(content, str):
+        return len(content)
+
+    size = 0
+    for block in content:
+        if isinstance(block, dict):
+            size += len(str(block.get("content", "")))
+        elif getattr(block, "type", None) == "text":
+            size += len(block.text)
+        else:
+            size += len(str(getattr(block, "input", "")))
+    return size
@@ -5,10 +5,16 @@ This module converts text into numerical vectors for similarity search.
 Everything runs locally on your machine — no data leaves your computer.
 """
 
-import struct
+import threading
+
+import numpy as np
+
+# BAAI/bge-small-en-v1.5 produces 384-dimensional vectors
+EMBEDDING_DIM = 384
 
 # We lazy load the model so the app starts fast
 _embed_model = None
+_model_lock = threading.Lock()
 
 def _get_model():
     global _embed_model
@@ -16,21 +22,41 @@ def _get_model():
     if _embed_model is not None:
         return _embed_model
     
-    try:
-        from fastembed import TextEmbedding
-        _embed_model = TextEmbedding(model_name="BAAI/bge-small-en-v1.5")
-        print("✅ FastEmbed loaded (384-dim, ONNX, fully local)")
-        return _embed_model
-    except ImportError:
-        raise ImportError(
-            "❌ FastEmbed is not installed! Memory search won't work without it.\n"
-            "   Stop Agent!\n"
-            "   Install it with: pip install fastembed\n"
-            "   Restart Agent then try again."
-        )
+    # Only one thread loads the model; the others wait for it
+    with _model_lock:
+        if _embed_model is not None:
+            return _embed_model
+        try:
+            from fastembed import TextEmbedding
+            _embed_model = TextEmbedding(model_name="BAAI/bge-small-en-v1.5")
+            print("✅ FastEmbed loaded (384-dim, ONNX, fully local)")
+            return _embed_model
+        except ImportError:
+            raise ImportError(
+                "❌ FastEmbed is not installed! Memory search won't work without it.\n"
+                "   Stop Agent!\n"
+                "   Install it with: pip install fastembed\n"
+                "   Restart Agent then try again."
+            )
+
+def preload_model():
+    """
+    Start loading the embedding model in a background thread.
+
+    Loading ONNX takes a few seconds; warming it up early means the
+    first save/search doesn't stall. Errors are ignored here — they
+    show up again (with the helpful message) on first real use.
+    """
+    def _load():
+        try:
+            _get_model()
+        except Exception:
+            pass
+
+    threading.Thread(target=_load, name="embed-preload", daemon=True).start()
 
 # Embed a single text string   
-def embed_text(text: str) -> list[float]:
+def embed_text(text: str) -> np.ndarray:
     """
     Convert a piece of text into a 384-dimensional vector.
     
@@ -45,30 +71,30 @@ def embed_text(text: str) -> list[float]:
         
     Returns
     -------
-    list[float]
-        A list of 384 numbers representing the text's meaning
+    np.ndarray
+        A float32 array of 384 numbers representing the text's meaning
         
     Example
     -------
     >>> vec = embed_text("I love programming in Python")
-    >>> len(vec)
-    384
-    >>> type(vec[0])
-    float
+    >>> vec.shape
+    (384,)
+    >>> vec.dtype
+    dtype('float32')
     """
     model = _get_model()
     
-    embeddings = list(model.embed([text]))
-    return embeddings[0].tolist()
+    # fastembed already yields numpy arrays — no need to convert to lists
+    return np.asarray(next(iter(model.embed([text]))), dtype=np.float32)
 
 # Process multiple texts at the same time    
-def embed_texts(texts: list[str]) -> list[list[float]]:
+def embed_texts(texts: list[str]) -> list[np.ndarray]:
     """Batch embed multiple texts at once (more efficient than one-by-one)."""
     model = _get_model()
 
-    return [e.tolist() for e in model.embed(texts)]
+    return [np.asarray(e, dtype=np.float32) for e in model.embed(texts)]
     
-def cosine_similarity(a: list[float], b: list[float]) -> float:
+def cosine_similarity(a: np.ndarray, b: np.ndarray) -> float:
     """
     Measure how similar two vectors are.
     
@@ -82,29 +108,69 @@ def cosine_similarity(a: list[float], b: list[float]) -> float:
     Don't worry if the math isn't clear — what matters is:
     higher number = more similar.
     """
-    dot = sum(x * y for x, y in zip(a, b))
     # Find the magnitude of each vector
-    norm_a = sum(x * x for x in a) ** .05
-    norm_b = sum(x * x for x in b) ** .05
+    norm_a = np.linalg.norm(a)
+    norm_b = np.linalg.norm(b)
 
     # Avoid division by zero if either of our vectors are 0
     if norm_a == 0 or norm_b == 0:
         return 0.0
     
-    return dot / (norm_a * norm_b)
+    return float(np.dot(a, b) / (norm_a * norm_b))
+
+def quantize(vec: np.ndarray) -> tuple[bytes, float]:
+    """
+    Squeeze a float32 vector into int8 with one scale factor.
 
-def serialize_vector(vec: list[float]) -> bytes:  
+    Every value is divided by scale = max(|vec|) / 127 and rounded,
+    so it fits in a signed byte. Multiplying back by the scale gives
+    a very close copy of the original — plenty for similarity search.
+    """
+    vec = np.asarray(vec, dtype=np.float32)
+    scale = float(np.max(np.abs(vec))) / 127 if vec.size else 0.0
+    if scale == 0:
+        return np.zeros(vec.shape, dtype=np.int8).tobytes(), 0.0
+
+    q = np.round(vec / scale).astype(np.int8)
+    return q.tobytes(), scale
+
+def dequantize(data: bytes, scale: float) -> np.ndarray:
+    """Turn int8 bytes + scale back into a float32 vector (reverse of quantize)."""
+    return np.frombuffer(data, dtype=np.int8).astype(np.float32) * np.float32(scale)
+
+def serialize_vector(vec: np.ndarray) -> bytes:  
     """
     Convert a vector to bytes for storage in SQLite.
     
-    SQLite doesn't have a "vector" column type, so we pack our
-    list of floats into raw bytes using Python's struct module.
+    SQLite doesn't have a "vector" column type, so we store the
+    vector quantized to int8: a 4-byte float32 scale followed by
+    one byte per dimension.
     
-    Each float is 4 bytes, so a 384-dim vector = 1,536 bytes.
+    A 384-dim vector = 388 bytes (instead of 1,536 as float32).
     """
-    return struct.pack(f"{len(vec)}f", *vec)
+    q, scale = quantize(vec)
+    return np.float32(scale).tobytes() + q
+
+def serialize_float32(vec: np.ndarray) -> bytes:
+    """Raw float32 bytes — the format sqlite-vec expects for float[] columns."""
+    return np.asarray(vec, dtype=np.float32).tobytes()
 
-def deserialize_vector(data: bytes) -> list[float]:
+def deserialize_vector(data: bytes) -> np.ndarray:
     """Convert bytes back to a vector (reverse of serialize_vector)."""
-    n = len(data) // 4 # Each float is 4 bytes
-    return list(struct.unpack(f"{n}f", data))
+    # Older databases stored raw float32 (4 bytes per dimension)
+    if len(data) == EMBEDDING_DIM * 4:
+        return np.frombuffer(data, dtype=np.float32)
+
+    scale = float(np.frombuffer(data[:4], dtype=np.float32)[0])
+    return dequantize(data[4:], scale)
+
+def deserialize_int8(data: bytes) -> np.ndarray:
+    """
+    Get the raw int8 codes of a stored vector, without rescaling.
+
+    The per-vector scale doesn't change a vector's direction, so for
+    cosine similarity the int8 codes can be used as-is.
+    """
+    if len(data) == EMBEDDING_DIM * 4:
+        return np.frombuffer(data, dtype=np.float32)
+    return np.frombuffer(data, dtype=np.int8, offset=4)
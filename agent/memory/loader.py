@@ -5,6 +5,7 @@ This module reads SOUL.md, USER.md, and MEMORY.md and combines them
 into a single string that gets included in every conversation with Claude.
 """
 
+from functools import lru_cache
 from pathlib import Path
 
 IDENTITY_FILES = [
@@ -31,6 +32,27 @@ def load_identity(memory_dir: Path) -> str:
         Combined content of all identity files
     """
 
+    memory_dir = Path(memory_dir)
+    return _load_identity_cached(str(memory_dir), _identity_mtimes(memory_dir))
+
+def _identity_mtimes(memory_dir: Path) -> tuple[int | None, ...]:
+    """Modification time of each identity file (None if it's missing)."""
+    mtimes = []
+    for filename, _ in IDENTITY_FILES:
+        try:
+            mtimes.append((memory_dir / filename).stat().st_mtime_ns)
+        except FileNotFoundError:
+            mtimes.append(None)
+    return tuple(mtimes)
+
+@lru_cache(maxsize=4)
+def _load_identity_cached(memory_dir: str, mtimes: tuple[int | None, ...]) -> str:
+    """
+    Read and combine the identity files.
+
+    Cached on the directory plus the files' mtimes, so the files are
+    only re-read after one of them has been edited.
+    """
     memory_dir = Path(memory_dir)
     sections = []
 
@@ -40,12 +62,12 @@ def load_identity(memory_dir: Path) -> str:
             content = filepath.read_text(encoding="utf-8").strip()
             if content:
                 sections.append(f"## {label}\n{content}")
-    else:
-        # If the file doesn't exist, add a helpful placeholder
-        sections.append(
-            f"## {label}\n"
-            f"*(No {filename} found - create one to personalize your agent)*"
-        )
+        else:
+            # If the file doesn't exist, add a helpful placeholder
+            sections.append(
+                f"## {label}\n"
+                f"*(No {filename} found - create one to personalize your agent)*"
+            )
     return "\n\n".join(sections)
 
 
@@ -10,19 +10,27 @@ This is where the agent's memories live.  Each memory is stored with:
 import sqlite3
 import datetime
 import re
+import time
 from pathlib import Path
 
+import numpy as np
+
 from agent.memory.embeddings import (
+    EMBEDDING_DIM,
     embed_text,
+    embed_texts,
     serialize_vector,
-    deserialize_vector,
-    cosine_similarity,
+    serialize_float32,
+    deserialize_int8,
 )
 
 # Hybrid search weights - from Cole Medlin's architecture
 VECTOR_WEIGHT = 0.7
 KEYWORD_WEIGHT = 0.3
 
+# Special characters that break FTS5 queries
+_FTS_SAFE_RE = re.compile(r'[^\w\s]')
+
 class MemoryStore:
     """
     Persistent memory backed by SQLite.
@@ -39,27 +47,60 @@ class MemoryStore:
         # make sure the directory for the database exists
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
 
+        # In-memory copy of every embedding, built lazily on first search.
+        # Rows are pre-normalized so a single matmul gives cosine scores.
+        self._matrix: np.ndarray | None = None
+        self._ids: np.ndarray | None = None
+
+        # One long-lived connection, reused by every method
+        self._conn = self._connect()
+
         # create tables if they don't exist
         self._init_db()
 
+        # Use sqlite-vec for vector search when it's installed
+        self._vec_enabled = self._init_vec()
+
     def _connect(self) -> sqlite3.Connection:
-        """Create a database connection"""
-        return sqlite3.connect(str(self.db_path))
+        """Open the database connection and tune it for an agent workload"""
+        conn = sqlite3.connect(
+            str(self.db_path),
+            check_same_thread=False,
+            isolation_level=None,  # autocommit; transactions need an explicit BEGIN
+        )
+        conn.executescript("""
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            PRAGMA temp_store=MEMORY;
+            PRAGMA cache_size=-20000;
+            PRAGMA mmap_size=268435456;
+        """)
+        # Rows support both tuple unpacking and dict(row)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def close(self):
+        """Close the database connection."""
+        self._conn.close()
     
     def _init_db(self):
         """Create the database tables if they don't exist"""
-        conn = self._connect()
+        self._migrate_timestamps()
 
-        conn.executescript("""
+        self._conn.executescript("""
             -- Main table: stores memories with their embeddings
             CREATE TABLE IF NOT EXISTS memories (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 content TEXT NOT NULL,
                 category TEXT NOT NULL DEFAULT 'fact',
                 embedding BLOB,
-                created_at TEXT NOT NULL,
-                updated_at TEXT NOT NULL
+                created_at INTEGER NOT NULL,  -- Unix time in microseconds
+                updated_at INTEGER NOT NULL
             );
+
+            -- Index so "most recent first" is an index scan, not a sort
+            CREATE INDEX IF NOT EXISTS idx_memories_created
+                ON memories(created_at);
                            
             -- FTS5 virtual table for fast keyword search
             CREATE VIRTUAL TABLE IF NOT EXISTS memories_fts USING fts5(
@@ -93,138 +134,350 @@ class MemoryStore:
             END;                                    
         """)
 
-        conn.close()
+    def _migrate_timestamps(self):
+        """
+        Convert databases from ISO-text timestamps to integer microseconds.
+
+        SQLite can't change a column's type in place, so the memories
+        table is rebuilt once. Its triggers are recreated by _init_db.
+        """
+        columns = {
+            row["name"]: row["type"]
+            for row in self._conn.execute("PRAGMA table_info(memories)")
+        }
+        if columns.get("created_at", "INTEGER").upper() != "TEXT":
+            return
+
+        rows = [
+            (r["id"], r["content"], r["category"], r["embedding"],
+             _iso_to_us(r["created_at"]), _iso_to_us(r["updated_at"]))
+            for r in self._conn.execute("SELECT * FROM memories")
+        ]
+
+        with self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.execute("""
+                CREATE TABLE memories_new (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    content TEXT NOT NULL,
+                    category TEXT NOT NULL DEFAULT 'fact',
+                    embedding BLOB,
+                    created_at INTEGER NOT NULL,
+                    updated_at INTEGER NOT NULL
+                )
+            """)
+            self._conn.executemany(
+                "INSERT INTO memories_new VALUES (?, ?, ?, ?, ?, ?)", rows
+            )
+            self._conn.execute("DROP TABLE memories")
+            self._conn.execute("ALTER TABLE memories_new RENAME TO memories")
+
+    def _init_vec(self) -> bool:
+        """
+        Try to load the optional sqlite-vec extension.
+
+        With it, vector search runs natively inside SQLite (C + SIMD)
+        instead of in NumPy. Without it, we quietly fall back.
+        """
+        try:
+            import sqlite_vec
+            self._conn.enable_load_extension(True)
+            sqlite_vec.load(self._conn)
+            self._conn.enable_load_extension(False)
+        except (ImportError, AttributeError, sqlite3.OperationalError):
+            return False
+
+        self._conn.execute(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS vec_memories USING vec0(
+                embedding float[{EMBEDDING_DIM}] distance_metric=cosine
+            )
+        """)
+
+        # Backfill memories saved while sqlite-vec wasn't available
+        missing = self._conn.execute("""
+            SELECT id, embedding FROM memories
+            WHERE embedding IS NOT NULL
+              AND id NOT IN (SELECT rowid FROM vec_memories)
+        """).fetchall()
+        if missing:
+            with self._conn:
+                self._conn.execute("BEGIN IMMEDIATE")
+                self._conn.executemany(
+                    "INSERT INTO vec_memories(rowid, embedding) VALUES (?, ?)",
+                    [(i, serialize_float32(deserialize_int8(b))) for i, b in missing]
+                )
+        return True
 
     def save(self, content: str, category: str = "fact") -> int:
         """Save new memory"""
-        now = datetime.datetime.now().isoformat()
-
-        # Generate the embedding vector for this memory
-        embedding = embed_text(content)
-        embedding_blob = serialize_vector(embedding)
-
-        conn = self._connect()
-        cursor = conn.execute(
-            """INSERT INTO memories
-                (content, category, embedding, created_at, updated_at)
-                VALUES (?, ?, ?, ?, ?)""",
-                (content, category, embedding_blob, now, now)
-        )
-        memory_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        return self.save_many([(content, category)])[0]
+
+    def save_many(self, items: list[tuple[str, str]]) -> list[int]:
+        """
+        Save several (content, category) memories at once.
+
+        All texts are embedded in one batched model call and inserted
+        in a single transaction. Returns the new memory IDs in order.
+        """
+        if not items:
+            return []
+
+        now = _now_us()
+
+        # Generate the embedding vectors for all memories in one go
+        embeddings = embed_texts([content for content, _ in items])
+        blobs = [serialize_vector(e) for e in embeddings]
+
+        rows = [
+            (content, category, blob, now, now)
+            for (content, category), blob in zip(items, blobs)
+        ]
+
+        with self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.executemany(
+                """INSERT INTO memories
+                    (content, category, embedding, created_at, updated_at)
+                    VALUES (?, ?, ?, ?, ?)""",
+                    rows
+            )
+            last_id = self._conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+
+            if not last_id:
+                raise RuntimeError("Failed to save memory - no ID returned")
+
+            # We hold the write lock for the whole batch, so IDs are consecutive
+            memory_ids = list(range(last_id - len(rows) + 1, last_id + 1))
+
+            if self._vec_enabled:
+                self._conn.executemany(
+                    "INSERT INTO vec_memories(rowid, embedding) VALUES (?, ?)",
+                    [(i, serialize_float32(e)) for i, e in zip(memory_ids, embeddings)]
+                )
+
+        # Keep the search matrix in sync (if it has been built yet)
+        if self._matrix is not None and self._ids is not None:
+            new_rows = _normalize(np.stack([deserialize_int8(b) for b in blobs]))
+            self._matrix = np.vstack([self._matrix, new_rows])
+            self._ids = np.append(self._ids, memory_ids)
+        return memory_ids
 
-        if memory_id is None:
-            raise RuntimeError("Failed to save memory - no ID returned")
-        return memory_id
+    def _load_matrix(self):
+        """
+        Stack every stored embedding into one (N, 384) normalized matrix.
+
+        Embeddings are stored as int8 to keep the database small, but
+        NumPy has no fast int8 matmul, so we expand to float32 here once
+        and let search() use the BLAS float32 path.
+        """
+        rows = self._conn.execute(
+            "SELECT id, embedding FROM memories WHERE embedding IS NOT NULL ORDER BY id"
+        ).fetchall()
+
+        if rows:
+            self._ids = np.array([r[0] for r in rows], dtype=np.int64)
+            self._matrix = _normalize(
+                np.stack([deserialize_int8(r[1]) for r in rows])
+            )
+        else:
+            self._ids = np.empty(0, dtype=np.int64)
+            self._matrix = np.empty((0, EMBEDDING_DIM), dtype=np.float32)
     
     def search(self, query: str, limit: int=5) -> list[dict]:
         """Hybrid search: 0.7 x vector similarity + 0.3 x keyword BM25."""
         # Step 1: Get the query embedding vector
         query_embedding = embed_text(query)
 
-        conn = self._connect()
-
-        # Step 2: Load all memories for vector comparison
-        rows = conn.execute(
-            "SELECT id, content, category, embedding, created_at FROM memories"
-        ).fetchall()
-
-        if not rows:
-            conn.close()
-            return []
-        
-        # Step 3: Calculate vector similarity for each memory
-        vector_scores = {}
-        for row in rows:
-            mem_id, content, category, emb_blob, created_at = row
-            if emb_blob:
-                mem_embedding = deserialize_vector(emb_blob)
-                similarity = cosine_similarity(query_embedding, mem_embedding)
-                vector_scores[mem_id] = {
-                    "content": content,
-                    "category": category,
-                    "created_at": created_at,
-                    "vector_score": max(0.0, similarity),
-                }
-
-        # Step 4: Run keyword search using FTS5       
-        keyword_scores = {}
+        # Step 2: Run keyword search using FTS5. SQLite normalizes the
+        # BM25 rank to 0..1 (best hit = 1.0) and joins in the content.
+        keyword_hits = {}
         try:
             # Remove special characters that break FTS5 queries
-            safe_query = re.sub(r'[^\w\s]', '', query)
+            safe_query = _FTS_SAFE_RE.sub('', query)
 
             if safe_query.strip():
-                fts_rows = conn.execute(
-                    """ SELECT rowid, rank
-                        FROM memories_fts
-                        WHERE memories_fts MATCH ?
-                        ORDER BY rank
-                        LIMIT ?""",
+                fts_rows = self._conn.execute(
+                    """ WITH hits AS (
+                            SELECT rowid AS id, bm25(memories_fts) AS rank
+                            FROM memories_fts
+                            WHERE memories_fts MATCH ?
+                            ORDER BY rank
+                            LIMIT ?
+                        ), bounds AS (
+                            SELECT id, rank,
+                                   MIN(rank) OVER () AS lo,
+                                   MAX(rank) OVER () AS hi
+                            FROM hits
+                        )
+                        SELECT m.id, m.content, m.category, m.created_at,
+                               CASE WHEN b.hi = b.lo THEN 1.0
+                                    ELSE 1.0 - (b.rank - b.lo) / (b.hi - b.lo)
+                               END
+                        FROM bounds b
+                        JOIN memories m ON m.id = b.id""",
                     (safe_query, limit * 3)
                 ).fetchall()
 
-                if fts_rows:
-                    min_rank = min(r[1] for r in fts_rows)
-                    max_rank = max(r[1] for r in fts_rows)
-                    rank_range = max_rank - min_rank if max_rank != min_rank else 1.0
-
-                    for rowid, rank in fts_rows:
-                        normalized = 1.0 - ((rank - min_rank) / rank_range) if rank_range else 1.0
-                        keyword_scores[rowid] = normalized
+                keyword_hits = {row[0]: row for row in fts_rows}
         except Exception:
             pass # Keyword search failed; vector search still works 
-        
-        conn.close()
 
-        # Step #5: Combine scores with weighted average
+        # Step 3: Vector scores for the top-k memories plus every keyword hit.
+        # Anything else scores 0.7 x vector only, so it can't make the cut.
+        if self._vec_enabled:
+            vector_scores = self._vector_scores_sqlite(
+                query_embedding, limit, list(keyword_hits)
+            )
+        else:
+            vector_scores = self._vector_scores_numpy(
+                query_embedding, limit, list(keyword_hits)
+            )
+
+        if not vector_scores:
+            return []
+
+        # Only fetch content for vector hits that keyword search didn't return
+        rows = list(keyword_hits.values())
+        missing = [i for i in vector_scores if i not in keyword_hits]
+        if missing:
+            placeholders = ",".join("?" * len(missing))
+            rows += self._conn.execute(
+                f"""SELECT id, content, category, created_at, 0.0
+                    FROM memories WHERE id IN ({placeholders})""",
+                missing,
+            ).fetchall()
+
+        # Step 4: Combine scores with weighted average
         combined = []
-        for mem_id, data in vector_scores.items():
-            v_score = data["vector_score"]
-            k_score = keyword_scores.get(mem_id, 0.0)
+        for mem_id, content, category, created_at, k_score in rows:
+            v_score = vector_scores.get(mem_id, 0.0)
             hybrid_score = (VECTOR_WEIGHT * v_score) + (KEYWORD_WEIGHT * k_score)
 
             combined.append({
                 "id": mem_id,
-                "content": data["content"],
-                "category": data["category"],
-                "created_at": data["created_at"],
+                "content": content,
+                "category": category,
+                "created_at": _us_to_iso(created_at),
                 "score": hybrid_score,
                 "vector_score": v_score,
                 "keyword_score": k_score,
             })  
-        # Step 6: Sort by hybrid score (highest first) and return top results
+        # Step 5: Sort by hybrid score (highest first) and return top results
         combined.sort(key=lambda x: x["score"], reverse=True)
         return combined[:limit]
 
+    def _vector_scores_numpy(
+        self,
+        query_embedding: np.ndarray,
+        limit: int,
+        extra_ids: list[int]
+    ) -> dict[int, float]:
+        """Score every memory with one matrix-vector product, keep the top-k."""
+        # Build the embedding matrix once, then reuse it
+        if self._matrix is None:
+            self._load_matrix()
+        matrix, ids = self._matrix, self._ids
+        assert matrix is not None and ids is not None
+
+        if len(ids) == 0:
+            return {}
+
+        scores = np.maximum(matrix @ _normalize(query_embedding), 0.0)
+
+        k = min(limit, len(ids))
+        positions = list(np.argpartition(scores, -k)[-k:])
+        for mem_id in extra_ids:
+            pos = int(np.searchsorted(ids, mem_id))
+            if pos < len(ids) and ids[pos] == mem_id:
+                positions.append(pos)
+
+        return {int(ids[i]): float(scores[i]) for i in positions}
+
+    def _vector_scores_sqlite(
+        self,
+        query_embedding: np.ndarray,
+        limit: int,
+        extra_ids: list[int]
+    ) -> dict[int, float]:
+        """Let sqlite-vec find the top-k inside SQLite (cosine distance)."""
+        query_blob = serialize_float32(query_embedding)
+
+        rows = self._conn.execute(
+            """ SELECT rowid, distance
+                FROM vec_memories
+                WHERE embedding MATCH ? AND k = ?
+                ORDER BY distance""",
+            (query_blob, limit)
+        ).fetchall()
+
+        # Keyword hits outside the top-k still need their vector score
+        missing = [i for i in extra_ids if i not in {r[0] for r in rows}]
+        if missing:
+            placeholders = ",".join("?" * len(missing))
+            rows += self._conn.execute(
+                f"""SELECT rowid, vec_distance_cosine(embedding, ?)
+                    FROM vec_memories
+                    WHERE rowid IN ({placeholders})""",
+                [query_blob, *missing]
+            ).fetchall()
+
+        # cosine distance = 1 - cosine similarity
+        return {rowid: max(0.0, 1.0 - distance) for rowid, distance in rows}
+
     def get_all(self, limit: int = 100) -> list[dict]:
         """Get all memories, most recent first"""
-        conn = self._connect()
-        rows = conn.execute(
-            "SELECT id, content, category, created_at FROM memories ORDER BY created_at DESC LIMIT ?",
+        rows = self._conn.execute(
+            """SELECT id, content, category, created_at FROM memories
+               ORDER BY created_at DESC, id DESC LIMIT ?""",
             (limit,)
-        ).fetchall()
-        conn.close()
-
+        )
         return [
-            {id: r[0], "content": r[1], "category": r[2], "created_at": r[3]}
+            {**dict(r), "created_at": _us_to_iso(r["created_at"])}
             for r in rows
         ]
     
     def delete(self, memory_id: int) -> bool:
         """Delete a memory by ID."""
-        conn = self._connect()
-        conn.execute("DELETE FROM memories WHERE id = ?", (memory_id,))
-        conn.commit()
-        affected = conn.total_changes
-        conn.close()
+        with self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            cursor = self._conn.execute(
+                "DELETE FROM memories WHERE id = ?", (memory_id,)
+            )
+            if self._vec_enabled:
+                self._conn.execute(
+                    "DELETE FROM vec_memories WHERE rowid = ?", (memory_id,)
+                )
+        # rowcount, not total_changes — the connection lives on
+        affected = cursor.rowcount
+
+        # Rebuild the search matrix on the next search
+        self._matrix = None
+        self._ids = None
         return affected > 0
     
     def count(self) -> int:
         """How many memories are stored."""
-        conn = self._connect()
-        count = conn.execute("SELECT COUNT(*) FROM memories").fetchone()[0]
-        conn.close()
-        return count
+        return self._conn.execute("SELECT COUNT(*) FROM memories").fetchone()[0]
         
         
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """Scale vectors (1-D or row-wise 2-D) to unit length, leaving zeros alone."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+def _now_us() -> int:
+    """Current time as integer Unix microseconds (how timestamps are stored)."""
+    return time.time_ns() // 1000
+
+def _us_to_iso(us: int) -> str:
+    """Stored microsecond timestamp -> local ISO 8601 string."""
+    seconds, micros = divmod(us, 1_000_000)
+    return datetime.datetime.fromtimestamp(seconds).replace(microsecond=micros).isoformat()
+
+def _iso_to_us(iso: str) -> int:
+    """Local ISO 8601 string (old storage format) -> microsecond timestamp."""
+    return round(datetime.datetime.fromisoformat(iso).timestamp() * 1_000_000)
@@ -2,113 +2,368 @@
 Skill Executor — runs skills safely in a sandboxed subprocess.
 
 Two types:
-1. Script-based: runs run.py or run.sh in a restricted environment
+1. Script-based: runs run.py (on a warm worker) or run.sh (in a persistent
+   shell) in a restricted environment
 2. Instruction-only: returns SKILL.md for Claude to follow
 """
 
+import asyncio
+import atexit
+import os
+import signal
 import subprocess
 import json
-from pathlib import Path
+import re
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Iterator
 
-from agent.skills.loader import SkillRegistry
+from agent.skills.loader import Skill, SkillRegistry
+from agent.skills.sandbox import MAX_OUTPUT_BYTES, SANDBOX_PATH, OutputLimitExceeded
+from agent.skills.shell_session import ShellSession
+from agent.skills.worker_pool import PythonWorkerPool
+
+# Characters not allowed in an environment variable name
+_ENV_UNSAFE_RE = re.compile(r"[^A-Za-z0-9_]")
+
+# Base environment per skill folder, built once
+_BASE_ENV: dict[str, dict[str, str]] = {}
+
+# Warm Python workers for run.py skills (created on first use)
+_python_pool: PythonWorkerPool | None = None
+
+# Persistent bash sessions for run.sh skills, one per skill folder
+MAX_SHELL_SESSIONS = 8
+_shell_sessions: OrderedDict[str, ShellSession] = OrderedDict()
+_shell_lock = threading.Lock()
 
 
 def execute_skill_action(
     registry: SkillRegistry,
     skill_name: str,
     parameters: dict,
-    timeout: int = 30
+    timeout: int = 30,
+    pretty: bool = False
 ) -> str:
-    """Execute a skill by name."""
+    """Execute a skill by name (`pretty` indents the parameters, for debugging)."""
     skill = registry.get(skill_name)
     if not skill:
-        available = ", ".join(registry.registry.keys()) or "none"
-        return f"Skill '{skill_name}' not found. Available: {available}"
+        return f"Skill '{skill_name}' not found. Available: {registry.available_names()}"
 
-    # Check for runnable scripts
-    script_path = skill.path / "run.py"
-    if script_path.exists():
-        return _run_python_script(script_path, parameters, skill.path, timeout)
+    # Which script (if any) was decided when the skill was loaded
+    if skill.runner == "python":
+        assert skill.run_py_str is not None  # always set for this runner
+        return _run_python_script(skill.run_py_str, parameters, skill.cwd_str, timeout)
 
-    shell_script = skill.path / "run.sh"
-    if shell_script.exists():
-        return _run_shell_script(shell_script, parameters, skill.path, timeout)
+    if skill.runner == "shell":
+        assert skill.run_sh_str is not None
+        return _run_shell_script(skill.run_sh_str, parameters, skill.cwd_str, timeout)
 
     # No script — return instructions for Claude to follow
+    return _instructions_result(skill, parameters, pretty)
+
+async def execute_skill_action_async(
+    registry: SkillRegistry,
+    skill_name: str,
+    parameters: dict,
+    timeout: int = 30,
+    pretty: bool = False
+) -> str:
+    """
+    Execute a skill by name without blocking the event loop.
+
+    Scripts run as asyncio subprocesses, so many skills can be in
+    flight at once from a single thread.
+    """
+    skill = registry.get(skill_name)
+    if not skill:
+        return f"Skill '{skill_name}' not found. Available: {registry.available_names()}"
+
+    if skill.runner == "python":
+        assert skill.run_py_str is not None
+        return await _run_python_script_async(skill.run_py_str, parameters, skill.cwd_str, timeout)
+
+    if skill.runner == "shell":
+        assert skill.run_sh_str is not None
+        return await _run_shell_script_async(skill.run_sh_str, parameters, skill.cwd_str, timeout)
+
+    return _instructions_result(skill, parameters, pretty)
+
+def _instructions_result(skill: Skill, parameters: dict, pretty: bool = False) -> str:
+    """The SKILL.md instructions plus parameters, for Claude to follow."""
     return (
-        f"## Skill: {skill.name}\n\n"
-        f"{skill.instructions}\n\n"
-        f"Parameters: {json.dumps(parameters, indent=2)}\n\n"
-        f"Follow the instructions above to complete this task."
+        skill.instruction_prefix
+        + json.dumps(parameters, indent=2 if pretty else None)
+        + "\n\nFollow the instructions above to complete this task."
     )
 
+@lru_cache(maxsize=4096)
+def _env_key(key: str) -> str:
+    """
+    Parameter name -> environment variable name ("max items" -> PARAM_MAX_ITEMS).
+
+    Anything but letters, digits and "_" becomes "_" ("file-name" ->
+    PARAM_FILE_NAME), so every name is a valid shell identifier and
+    can't smuggle shell syntax into the session's export commands.
+    """
+    return "PARAM_" + _ENV_UNSAFE_RE.sub("_", key.upper())
+
+def _base_env(cwd: str) -> dict[str, str]:
+    """The restricted environment for a skill folder (cached; don't mutate)."""
+    env = _BASE_ENV.get(cwd)
+    if env is None:
+        env = _BASE_ENV[cwd] = {"PATH": SANDBOX_PATH, "HOME": cwd}
+    return env
+
+def _script_env(cwd: str, parameters: dict) -> dict[str, str]:
+    """Base environment plus one PARAM_* variable per parameter."""
+    return {
+        **_base_env(cwd),
+        **{_env_key(key): str(value) for key, value in parameters.items()},
+    }
+
+def _encode_parameters(parameters: dict) -> bytes:
+    """Parameters as compact UTF-8 JSON, encoded once for the script's stdin."""
+    return json.dumps(parameters, separators=(",", ":")).encode("utf-8")
+
+def _get_python_pool() -> PythonWorkerPool:
+    """The shared worker pool, started on first use."""
+    global _python_pool
+    if _python_pool is None:
+        _python_pool = PythonWorkerPool()
+    return _python_pool
+
 def _run_python_script(
-    script_path: Path,
+    script_path: str,
     parameters: dict,
-    cwd: Path,
+    cwd: str,
     timeout: int
 ) -> str:
-    """Run a Python script in a sandboxed subprocess."""
+    """Run a Python script on a warm, sandboxed worker process."""
     try:
-        result = subprocess.run(
-            ["python", str(script_path)],
-            input=json.dumps(parameters),
-            capture_output=True,
-            text=True,
-            timeout=timeout,
-            cwd=str(cwd),
-            env={
-                "PATH": "/usr/bin:/usr/local/bin",
-                "HOME": str(cwd),
-            },
+        returncode, output, errors = _get_python_pool().execute(
+            script_path, _encode_parameters(parameters), cwd, timeout
         )
 
-        output = result.stdout.strip()
-        errors = result.stderr.strip()
+        output = output.strip()
+        errors = errors.strip()
 
-        if result.returncode != 0:
-            return f"Script failed (exit {result.returncode}):\n{errors}"
+        if returncode != 0:
+            return f"Script failed (exit {returncode}):\n{errors}"
 
         return output if output else "Script completed."
 
     except subprocess.TimeoutExpired:
         return f"Script timed out after {timeout}s."
+    except OutputLimitExceeded:
+        return f"Script stopped: output exceeded {MAX_OUTPUT_BYTES} bytes."
     except Exception as e:
         return f"Script error: {e}"
 
 
+@contextmanager
+def _shell_session(cwd: str) -> Iterator[ShellSession]:
+    """
+    The live shell session for a skill folder, held for one call.
+
+    Least recently used sessions are closed once there are more than
+    MAX_SHELL_SESSIONS — but never while a caller is holding one.
+    """
+    with _shell_lock:
+        session = _shell_sessions.pop(cwd, None)
+        if session is None or not session.alive():
+            session = ShellSession(cwd)
+        _shell_sessions[cwd] = session  # most recently used goes last
+        session.users += 1
+
+        idle = [key for key, s in _shell_sessions.items() if s.users == 0]
+        for key in idle[:len(_shell_sessions) - MAX_SHELL_SESSIONS]:
+            _shell_sessions.pop(key).kill()
+    try:
+        yield session
+    finally:
+        with _shell_lock:
+            session.users -= 1
+
+def _close_shell_sessions():
+    """Stop every shell session (at exit)."""
+    with _shell_lock:
+        while _shell_sessions:
+            _shell_sessions.popitem()[1].kill()
+
+atexit.register(_close_shell_sessions)
+
 def _run_shell_script(
-    script_path: Path,
+    script_path: str,
     parameters: dict,
-    cwd: Path,
+    cwd: str,
     timeout: int
 ) -> str:
-    """Run a shell script in a sandboxed subprocess."""
+    """Run a shell script in a sandboxed subshell of a persistent bash."""
     try:
-        env = {"PATH": "/usr/bin:/usr/local/bin", "HOME": str(cwd)}
+        env = _script_env(cwd, parameters)
 
-        for key, value in parameters.items():
-            safe_key = key.upper().replace(" ", "_")
-            env[f"PARAM_{safe_key}"] = str(value)
+        with _shell_session(cwd) as session:
+            returncode, output, errors = session.run(script_path, env, cwd, timeout)
 
-        result = subprocess.run(
-            ["bash", str(script_path)],
-            capture_output=True,
-            text=True,
-            timeout=timeout,
-            cwd=str(cwd),
-            env=env,
+        output = output.strip()
+        errors = errors.strip()
+
+        if returncode != 0:
+            return f"Script failed:\n{errors}"
+
+        return output if output else "Script completed."
+
+    except subprocess.TimeoutExpired:
+        return f"Script timed out after {timeout}s."
+    except OutputLimitExceeded:
+        return f"Script stopped: output exceeded {MAX_OUTPUT_BYTES} bytes."
+    except Exception as e:
+        return f"Script error: {e}"
+
+
+async def _run_python_script_async(
+    script_path: str,
+    parameters: dict,
+    cwd: str,
+    timeout: int
+) -> str:
+    """Run a Python script in a sandboxed asyncio subprocess."""
+    try:
+        returncode, output, errors = await _run_subprocess_async(
+            ["python", script_path],
+            _encode_parameters(parameters),
+            cwd,
+            _base_env(cwd),
+            timeout,
         )
 
-        output = result.stdout.strip()
-        errors = result.stderr.strip()
+        if returncode != 0:
+            return f"Script failed (exit {returncode}):\n{errors}"
+
+        return output if output else "Script completed."
+
+    except asyncio.TimeoutError:
+        return f"Script timed out after {timeout}s."
+    except OutputLimitExceeded:
+        return f"Script stopped: output exceeded {MAX_OUTPUT_BYTES} bytes."
+    except Exception as e:
+        return f"Script error: {e}"
+
+
+async def _run_shell_script_async(
+    script_path: str,
+    parameters: dict,
+    cwd: str,
+    timeout: int
+) -> str:
+    """Run a shell script in a sandboxed asyncio subprocess."""
+    try:
+        env = _script_env(cwd, parameters)
+
+        returncode, output, errors = await _run_subprocess_async(
+            ["bash", script_path], None, cwd, env, timeout
+        )
 
-        if result.returncode != 0:
+        if returncode != 0:
             return f"Script failed:\n{errors}"
 
         return output if output else "Script completed."
 
-    except subprocess.TimeoutExpired:
+    except asyncio.TimeoutError:
         return f"Script timed out after {timeout}s."
+    except OutputLimitExceeded:
+        return f"Script stopped: output exceeded {MAX_OUTPUT_BYTES} bytes."
     except Exception as e:
-        return f"Script error: {e}"
\ No newline at end of file
+        return f"Script error: {e}"
+
+
+async def _run_subprocess_async(
+    args: list[str],
+    stdin: bytes | None,
+    cwd: str,
+    env: dict[str, str],
+    timeout: int
+) -> tuple[int, str, str]:
+    """
+    Run a command, feed it stdin, and collect (exit code, stdout, stderr).
+
+    Both pipes are read in chunks at the same time (so neither can fill
+    up and stall the process) and decoded once. Raises asyncio.TimeoutError
+    on timeout, or OutputLimitExceeded if the process prints more than
+    MAX_OUTPUT_BYTES — the process is killed in both cases.
+    """
+    proc = await asyncio.create_subprocess_exec(
+        *args,
+        stdin=asyncio.subprocess.PIPE if stdin is not None else asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        cwd=cwd,
+        env=env,
+        start_new_session=True,  # own process group, so a kill gets its children too
+    )
+    try:
+        stdout, stderr, _ = await asyncio.wait_for(
+            asyncio.gather(
+                _read_capped(proc.stdout, proc),
+                _read_capped(proc.stderr, proc),
+                _feed_stdin(proc, stdin),
+            ),
+            timeout=timeout,
+        )
+        await proc.wait()
+    except (asyncio.TimeoutError, OutputLimitExceeded):
+        _kill_group(proc)
+        await proc.wait()
+        raise
+
+    assert proc.returncode is not None
+    return (
+        proc.returncode,
+        stdout.decode("utf-8", "replace").strip(),
+        stderr.decode("utf-8", "replace").strip(),
+    )
+
+
+async def _read_capped(
+    stream: asyncio.StreamReader | None,
+    proc: asyncio.subprocess.Process
+) -> bytearray:
+    """Read a pipe to EOF; kill the process if it goes past MAX_OUTPUT_BYTES."""
+    buf = bytearray()
+    if stream is None:
+        return buf
+    while chunk := await stream.read(65536):
+        buf += chunk
+        if len(buf) > MAX_OUTPUT_BYTES:
+            _kill_group(proc)
+            raise OutputLimitExceeded(f"output exceeded {MAX_OUTPUT_BYTES} bytes")
+    return buf
+
+
+async def _feed_stdin(proc: asyncio.subprocess.Process, stdin: bytes | None):
+    """Write stdin to the process and close it (a script may not read it all)."""
+    if stdin is None or proc.stdin is None:
+        return
+    try:
+        proc.stdin.write(stdin)
+        await proc.stdin.drain()
+        proc.stdin.close()
+    except (BrokenPipeError, ConnectionResetError):
+        pass
+
+
+def _kill_group(proc: asyncio.subprocess.Process):
+    """
+    Kill a script and everything it started.
+
+    Killing just the script could leave a child (e.g. the other end of a
+    shell pipeline) holding the output pipes open, and the wait for the
+    script would never finish.
+    """
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
@@ -5,10 +5,21 @@ Drop a folder with a SKILL.md into skills/ and it's instantly available.
 No public registry, no supply chain risk.
 """
 
+import os
 import re
+import threading
 import yaml
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Iterator, Literal
 from dataclasses import dataclass, field
+from functools import cached_property
+
+# libyaml's C loader is much faster; fall back to pure Python if missing
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
 
 @dataclass
 class Skill:
@@ -19,7 +30,53 @@ class Skill:
     triggers: list[str]
     instructions: str
     path: Path
-    files: list[str] = field(default_factory=list)
+    # How the skill runs: run.py, run.sh, or just its instructions
+    runner: Literal["python", "shell", "instructions"] = "instructions"
+    # Fixed start of the reply for instruction-only skills (built once)
+    instruction_prefix: str = field(init=False, repr=False)
+    # String forms of the paths the executor hands to processes (built once)
+    path_str: str = field(init=False, repr=False)
+    cwd_str: str = field(init=False, repr=False)
+    run_py_str: str | None = field(init=False, repr=False)
+    run_sh_str: str | None = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.instruction_prefix = (
+            f"## Skill: {self.name}\n\n{self.instructions}\n\nParameters: "
+        )
+        self.path_str = str(self.path)
+        # Absolute, so scripts work no matter what directory they run from
+        self.cwd_str = os.path.abspath(self.path_str)
+        self.run_py_str = (
+            os.path.join(self.cwd_str, "run.py") if self.runner == "python" else None
+        )
+        self.run_sh_str = (
+            os.path.join(self.cwd_str, "run.sh") if self.runner == "shell" else None
+        )
+
+    @cached_property
+    def files(self) -> list[str]:
+        """Other files in the skill folder (listed on first access only)."""
+        return [
+            p for p in _walk_files(str(self.path))
+            if p != "SKILL.md" and not p.endswith(os.sep + "SKILL.md")
+        ]
+
+# Fallback for frontmatter with unusual whitespace (e.g. "---  " or CRLF)
+_FRONTMATTER_RE = re.compile(r"^---\s*\n(.*?)\n---\s*\n(.*)", re.DOTALL)
+
+# Fast path for flat "key: value" frontmatter — anything fancier goes to YAML
+_SIMPLE_LINE_RE = re.compile(r"(\w+): +(.+)")
+_PLAIN_VALUE_RE = re.compile(r"[A-Za-z][^#:{}\[\]|>&*!%@`\"']*")
+# Plain words YAML reads as booleans or null, not strings
+_YAML_SPECIAL_WORDS = {
+    "yes", "no", "true", "false", "on", "off", "null",
+}
+
+# Parsed skills, shared by every registry in this process:
+# SKILL.md path -> ((mtime_ns, size, folder mtime_ns), Skill).
+# A reload only re-parses folders whose files actually changed.
+_SKILL_CACHE: dict[str, tuple[tuple[int, int, int], Skill]] = {}
 
 class SkillRegistry:
     """Discovers and manages local skills."""
@@ -27,6 +84,10 @@ class SkillRegistry:
     def __init__(self, skills_dir: Path):
         self.skills_dir = Path(skills_dir)
         self.registry: dict[str, Skill] = {}
+        self._description_cache: str | None = None
+        self._names_cache: str | None = None
+        self._lock = threading.Lock()  # the file watcher updates from its own thread
+        self._observer = None
         self._discover()
 
     def _discover(self):
@@ -35,34 +96,54 @@ class SkillRegistry:
             self.skills_dir.mkdir(parents=True, exist_ok=True)
             return
 
-        for skill_dir in self.skills_dir.iterdir():
-            if not skill_dir.is_dir():
-                continue
+        candidates = [
+            (skill_dir / "SKILL.md", skill_dir)
+            for skill_dir in self.skills_dir.iterdir()
+            if skill_dir.is_dir()
+        ]
+        if not candidates:
+            return
 
-            skill_md = skill_dir / "SKILL.md"
-            if not skill_md.exists():
-                continue
-            try:
-                skill = self._parse_skill(skill_md, skill_dir)
-                self.registry[skill.name] = skill
-            except Exception as e:
-                print(f"⚠️  Failed to load skill from {skill_dir}: {e}")
+        # Loading is mostly file I/O, so parse the folders in parallel.
+        # map() keeps the original order, so results are deterministic.
+        with ThreadPoolExecutor(max_workers=min(32, len(candidates))) as pool:
+            for skill in pool.map(lambda c: self._safe_parse(*c), candidates):
+                if skill is not None:
+                    self.registry[skill.name] = skill
 
-        if not self.skills_dir.exists():
-            self.skills_dir.mkdir(parents=True, exist_ok=True)
-            return
-        
-        for skill_dir in self.skills_dir.iterdir():
-            if not skill_dir.is_dir():
-                continue
-            skill_md = skill_dir / "SKILL.md"
-            if not skill_md.exists():
-                continue
-            try:
-                skill = self._parse_skill(skill_md, skill_dir)
-                self.registry[skill.name] = skill
-            except Exception as e:
-                print(f"⚠️  Failed to load skill from {skill_dir}: {e}")
+        self._names_cache = None
+
+    def _safe_parse(self, skill_md: Path, skill_dir: Path) -> Skill | None:
+        """Load one skill folder; print a warning and return None on failure."""
+        try:
+            return self._load_cached(skill_md, skill_dir)
+        except Exception as e:
+            print(f"⚠️  Failed to load skill from {skill_dir}: {e}")
+            return None
+
+    def _load_cached(self, skill_md: Path, skill_dir: Path) -> Skill | None:
+        """
+        Return the parsed skill, reusing the cached copy if nothing changed.
+
+        The folder's mtime is part of the key too, so adding or removing
+        files next to SKILL.md (e.g. run.py) is picked up. Returns None
+        when the folder has no SKILL.md.
+        """
+        try:
+            st = os.stat(skill_md)
+        except FileNotFoundError:
+            return None
+
+        key = str(skill_md)
+        stamp = (st.st_mtime_ns, st.st_size, os.stat(skill_dir).st_mtime_ns)
+
+        cached = _SKILL_CACHE.get(key)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+
+        skill = self._parse_skill(skill_md, skill_dir)
+        _SKILL_CACHE[key] = (stamp, skill)
+        return skill
 
     def _parse_skill(self, skill_md: Path, skill_dir: Path) -> Skill:
         """Parse a SKILL.md file with YAML frontmatter."""
@@ -70,27 +151,15 @@ class SkillRegistry:
 
         # Extract YAML frontmatter (between --- markers)
         frontmatter = {}
-        body = content
+        fm_text, body = _split_frontmatter(content)
 
-        fm_match = re.match(
-            r"^---\s*\n(.*?)\n---\s*\n(.*)",
-            content,
-            re.DOTALL
-        )
-
-        if fm_match:
-            try:
-                frontmatter = yaml.safe_load(fm_match.group(1)) or {}
-            except yaml.YAMLError:
-                pass  # Bad YAML — use defaults
-            body = fm_match.group(2)
-
-        # List other files in the skill directory
-        files = [
-            str(f.relative_to(skill_dir))
-            for f in skill_dir.rglob("*")
-            if f.is_file() and f.name != "SKILL.md"
-        ]
+        if fm_text is not None:
+            frontmatter = _parse_simple_frontmatter(fm_text)
+            if frontmatter is None:
+                try:
+                    frontmatter = yaml.load(fm_text, Loader=_YamlLoader) or {}
+                except yaml.YAMLError:
+                    frontmatter = {}  # Bad YAML — use defaults
 
         return Skill(
             name=frontmatter.get("name", skill_dir.name),
@@ -99,23 +168,36 @@ class SkillRegistry:
             triggers=frontmatter.get("triggers", []),
             instructions=body.strip(),
             path=skill_dir,
-            files=files,
+            runner=_detect_runner(skill_dir),
         )
     
     def get(self, name: str) -> Skill | None:
         """Get a skill by name."""
         return self.registry.get(name)
 
+    def available_names(self) -> str:
+        """Comma-separated skill names (cached until the next reload)."""
+        if self._names_cache is None:
+            self._names_cache = ", ".join(sorted(self.registry)) or "none"
+        return self._names_cache
+
     def describe_all(self) -> str:
         """Tier 1: brief description of all skills."""
+        # Cached until the next reload() — the same string object is
+        # returned each time, so callers can cheaply detect changes
+        if self._description_cache is not None:
+            return self._description_cache
+
         if not self.registry:
-            return "No skills loaded. Add folders to skills/ directory."
+            self._description_cache = "No skills loaded. Add folders to skills/ directory."
+            return self._description_cache
 
         lines = []
         for name, skill in sorted(self.registry.items()):
             lines.append(f"- **{name}**: {skill.description}")
 
-        return "\n".join(lines)
+        self._description_cache = "\n".join(lines)
+        return self._description_cache
 
     def get_full_instructions(self, name: str) -> str | None:
         """Tier 2: full SKILL.md instructions."""
@@ -124,5 +206,176 @@ class SkillRegistry:
 
     def reload(self):
         """Re-scan the skills directory (for hot reloading)."""
-        self.registry.clear()
-        self._discover()
\ No newline at end of file
+        with self._lock:
+            self.registry.clear()
+            self._description_cache = None
+            self._names_cache = None
+            self._discover()
+
+    # ── Hot reload ──────────────────────────────────────────────
+
+    def start_watching(self) -> bool:
+        """
+        Watch skills/ and re-parse only the folder that changed.
+
+        Needs the optional `watchdog` package; returns False (and keeps
+        working without hot reload) if it isn't installed. Falls back to
+        a polling observer where native file events aren't available.
+        """
+        if self._observer is not None:
+            return True
+
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+            from watchdog.observers.polling import PollingObserver
+        except ImportError:
+            print("⚠️  Install watchdog to reload skills automatically.")
+            return False
+
+        registry = self
+
+        class _Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if event.event_type not in ("created", "modified", "deleted", "moved"):
+                    return
+                for path in (event.src_path, getattr(event, "dest_path", "")):
+                    skill_dir = registry._skill_dir_for(path)
+                    if skill_dir is not None:
+                        registry._reparse_one(skill_dir)
+
+        try:
+            observer = Observer()
+            observer.schedule(_Handler(), str(self.skills_dir), recursive=True)
+            observer.start()
+        except OSError:
+            observer = PollingObserver()
+            observer.schedule(_Handler(), str(self.skills_dir), recursive=True)
+            observer.start()
+
+        self._observer = observer
+        return True
+
+    def stop_watching(self):
+        """Stop the file watcher started by start_watching()."""
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+
+    def _skill_dir_for(self, path: str | bytes) -> Path | None:
+        """The skill folder a changed path belongs to (None if outside one)."""
+        try:
+            rel = Path(os.fsdecode(path)).relative_to(self.skills_dir)
+        except ValueError:
+            return None
+        if not rel.parts:
+            return None  # skills/ itself
+        return self.skills_dir / rel.parts[0]
+
+    def _reparse_one(self, skill_dir: Path):
+        """Drop one folder's skill and load it again if it still exists."""
+        with self._lock:
+            for name, skill in list(self.registry.items()):
+                if skill.path == skill_dir:
+                    self.registry.pop(name, None)
+
+            # Something in the folder changed, so don't trust the cached copy
+            _SKILL_CACHE.pop(str(skill_dir / "SKILL.md"), None)
+            if skill_dir.is_dir():
+                skill = self._safe_parse(skill_dir / "SKILL.md", skill_dir)
+                if skill is not None:
+                    self.registry[skill.name] = skill
+
+            self._names_cache = None
+            self._description_cache = None
+
+
+def _split_frontmatter(content: str) -> tuple[str | None, str]:
+    """
+    Split a SKILL.md into (frontmatter text, body).
+
+    The common case is a plain string search for the closing "---" line;
+    the regex is only a fallback for odd whitespace. Returns None for the
+    frontmatter if there isn't any.
+    """
+    if content.startswith("---\n"):
+        fm_text, sep, body = content[4:].partition("\n---\n")
+        # Only trust the string search when the regex would agree: no
+        # earlier line starting with "---" (e.g. a closing "---  " with
+        # trailing spaces), and no blank space at the edges for it to absorb
+        if (
+            sep
+            and fm_text
+            and "\n---" not in fm_text
+            and not fm_text.startswith("---")
+            and not fm_text[:1].isspace()
+            and not body[:1].isspace()
+        ):
+            return fm_text, body
+
+    fm_match = _FRONTMATTER_RE.match(content)
+    if fm_match:
+        return fm_match.group(1), fm_match.group(2)
+
+    return None, content
+
+def _detect_runner(skill_dir: Path) -> Literal["python", "shell", "instructions"]:
+    """Which script a skill folder has (run.py wins over run.sh), in one scan."""
+    with os.scandir(skill_dir) as it:
+        names = {entry.name for entry in it}
+    if "run.py" in names:
+        return "python"
+    if "run.sh" in names:
+        return "shell"
+    return "instructions"
+
+
+def _walk_files(root: str, prefix: str = "") -> Iterator[str]:
+    """
+    Yield every file under root as a path relative to root.
+
+    Uses os.scandir, whose entries already know whether they're files
+    or folders, so we skip a stat call and a Path object per entry.
+    """
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _walk_files(entry.path, prefix + entry.name + os.sep)
+            elif entry.is_file():
+                yield prefix + entry.name
+
+
+def _parse_simple_frontmatter(fm_text: str) -> dict | None:
+    """
+    Parse flat "key: value" frontmatter without YAML.
+
+    Only handles values YAML would read as plain strings (starting with a
+    letter, or simply quoted). Returns None as soon as anything else
+    shows up — lists, numbers, comments, nesting — so the caller can
+    fall back to the real YAML parser and get identical results.
+    """
+    if "\t" in fm_text:
+        return None  # YAML is picky about tabs; let it decide
+
+    result = {}
+    for line in fm_text.split("\n"):
+        line = line.rstrip()
+        if not line:
+            continue
+
+        match = _SIMPLE_LINE_RE.fullmatch(line)
+        if not match:
+            return None
+        key, value = match.groups()
+
+        if value[0] in "\"'" and len(value) >= 2 and value[-1] == value[0]:
+            inner = value[1:-1]
+            if "\\" in inner or '"' in inner or "'" in inner:
+                return None
+            result[key] = inner
+        elif _PLAIN_VALUE_RE.fullmatch(value) and value.lower() not in _YAML_SPECIAL_WORDS:
+            result[key] = value
+        else:
+            return None
+    return result
@@ -0,0 +1,16 @@
+"""
+Sandbox — the limits every skill script runs under, in one place.
+
+Scripts run on warm Python workers, in persistent shell sessions, or as
+asyncio subprocesses; all of them share these settings.
+"""
+
+# Skill scripts only see these directories on PATH
+SANDBOX_PATH = "/usr/bin:/usr/local/bin"
+
+# A script that prints more than this (to stdout or stderr) is stopped
+MAX_OUTPUT_BYTES = 4 * 1024 * 1024
+
+
+class OutputLimitExceeded(Exception):
+    """A skill script printed more than the output cap and was stopped."""
@@ -0,0 +1,57 @@
+"""
+Skill Scheduler — runs many skill calls at once, within limits.
+
+When the agent fires off a batch of skill calls, running them one by one
+wastes time; running all of them at once can start dozens of processes
+(a "fork storm"). The scheduler sits in between with two pools:
+
+- Compute: skills with run.py / run.sh. At most one per CPU core in
+  flight — more would just fight over the CPUs.
+- I/O: instruction-only skills. They do no real work here (the model
+  follows the instructions), so many can be in flight at once.
+
+Usage:
+    scheduler = SkillScheduler(registry)
+    results = await scheduler.schedule_many([("echo", {"a": 1}), ("notes", {})])
+"""
+
+import asyncio
+import os
+
+from agent.skills.executor import execute_skill_action_async
+from agent.skills.loader import SkillRegistry
+
+
+class SkillScheduler:
+    """Bounded concurrent execution of skills, split by how they run."""
+
+    def __init__(
+        self,
+        registry: SkillRegistry,
+        max_compute: int | None = None,
+        max_io: int = 64,
+        timeout: int = 30
+    ):
+        self.registry = registry
+        self.timeout = timeout
+        # CPU-bound skills should never exceed the number of cores in flight
+        self._compute_sem = asyncio.Semaphore(max_compute or os.cpu_count() or 1)
+        self._io_sem = asyncio.Semaphore(max_io)
+
+    async def submit(self, name: str, params: dict) -> str:
+        """Run one skill once a slot in its pool is free."""
+        skill = self.registry.get(name)
+        # Unknown skills just produce the "not found" reply — no real work
+        if skill is None or skill.runner == "instructions":
+            sem = self._io_sem
+        else:
+            sem = self._compute_sem
+
+        async with sem:
+            return await execute_skill_action_async(
+                self.registry, name, params, self.timeout
+            )
+
+    async def schedule_many(self, calls: list[tuple[str, dict]]) -> list[str]:
+        """Run (name, params) calls concurrently; results come back in order."""
+        return await asyncio.gather(*(self.submit(name, params) for name, params in calls))
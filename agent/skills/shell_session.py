@@ -0,0 +1,200 @@
+"""
+Shell Session — one long-lived bash that runs run.sh skills on request.
+
+Spawning a fresh `bash` (fork + exec + startup) for every run.sh is the
+main cost when the script itself is tiny. Instead we keep a bash process
+alive and, for each call, run the script in a subshell:
+
+    ( cd CWD && export HOME=... && export PARAM_X=... && BASH_ARGV0=SCRIPT && . SCRIPT ) </dev/null >OUT 2>ERR
+
+Setting BASH_ARGV0 makes `$0` the script path, just as if the script had
+been run directly instead of sourced. A subshell is just a fork of the
+running bash, so nothing leaks between calls: `cd`, exports, `set -e`
+and even `exit` stay inside it. OUT and ERR are fresh named pipes
+(FIFOs) for every call, read together (so neither can fill up and stall
+the script) until every writer has closed them — just like
+`subprocess.run` waits for its pipes. A background job that outlives
+the script is waited for too, and can never write into the next call's
+output. The exit code comes back on the shell's own stdout as a
+sentinel line. A script that prints more than `max_output_bytes` is
+killed along with the session, so a runaway script can't eat all our
+memory.
+"""
+
+import os
+import re
+import secrets
+import select
+import shlex
+import signal
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+
+from agent.skills.sandbox import MAX_OUTPUT_BYTES, SANDBOX_PATH, OutputLimitExceeded
+
+# Names that are safe to put in an `export` command as-is
+_ENV_NAME_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+
+class ShellSession:
+    """A persistent bash process. Calls are serialized with a lock."""
+
+    def __init__(self, cwd: str, max_output_bytes: int = MAX_OUTPUT_BYTES):
+        self.cwd = cwd
+        self.max_output_bytes = max_output_bytes
+        self._lock = threading.Lock()
+        self.users = 0  # callers holding this session (kept by the executor)
+        # Per-call FIFOs live here; a counter keeps their names unique
+        self._fifo_dir = tempfile.mkdtemp(prefix="skill-shell-")
+        self._calls = 0
+        # A random sentinel, so script output can't fake the end marker
+        token = secrets.token_hex(8)
+        self._rc_prefix = f"<<<RC_{token}:".encode()
+        self._end = f"<<<END_{token}>>>\n".encode()
+
+        self.process = subprocess.Popen(
+            ["bash", "--noprofile", "--norc"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,   # only our exit-code sentinel lines
+            stderr=subprocess.DEVNULL,
+            bufsize=0,
+            cwd=cwd,
+            env={"PATH": SANDBOX_PATH, "HOME": cwd},
+            start_new_session=True,  # own process group, so kill() gets children too
+        )
+
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def run(
+        self,
+        script: str,
+        env: dict[str, str],
+        cwd: str,
+        timeout: float
+    ) -> tuple[int, str, str]:
+        """
+        Run a script in a subshell and return (exit_code, stdout, stderr).
+
+        `env` is exported into the subshell; its names must be plain
+        shell identifiers (ValueError otherwise).
+
+        Raises subprocess.TimeoutExpired if it runs too long, or
+        OutputLimitExceeded if it prints too much (either way the whole
+        session is killed — the caller should start a new one).
+        """
+        exports = ""
+        for k, v in env.items():
+            if not _ENV_NAME_RE.fullmatch(k):
+                raise ValueError(f"invalid environment variable name: {k!r}")
+            exports += f"export {k}={shlex.quote(v)} && "
+        rc_prefix = self._rc_prefix.decode()
+        end = self._end.decode().strip()
+
+        with self._lock:
+            self._calls += 1
+            out_path = os.path.join(self._fifo_dir, f"out.{self._calls}")
+            err_path = os.path.join(self._fifo_dir, f"err.{self._calls}")
+            readers: list[int] = []
+            holders: list[int] = []
+            try:
+                for path in (out_path, err_path):
+                    os.mkfifo(path, 0o600)
+                    readers.append(os.open(path, os.O_RDONLY | os.O_NONBLOCK))
+                    # Hold a write end until the script is done, so the
+                    # FIFO doesn't report EOF before bash has opened it
+                    holders.append(os.open(path, os.O_WRONLY | os.O_NONBLOCK))
+
+                command = (
+                    f"( cd {shlex.quote(cwd)} && {exports}"
+                    f"BASH_ARGV0={shlex.quote(script)} && . {shlex.quote(script)} ) "
+                    f"</dev/null >{shlex.quote(out_path)} 2>{shlex.quote(err_path)}\n"
+                    f"printf '{rc_prefix}%d{end}\\n' $?\n"
+                )
+                assert self.process.stdin is not None
+                self.process.stdin.write(command.encode("utf-8"))
+
+                code, out, err = self._collect(script, *readers, holders, timeout)
+            finally:
+                for fd in readers + holders:
+                    os.close(fd)
+                for path in (out_path, err_path):
+                    try:
+                        os.unlink(path)
+                    except FileNotFoundError:
+                        pass  # kill() already removed the directory
+
+        return (
+            code,
+            out.decode("utf-8", "replace"),
+            err.decode("utf-8", "replace"),
+        )
+
+    def _collect(
+        self,
+        script: str,
+        out_fd: int,
+        err_fd: int,
+        holders: list[int],
+        timeout: float
+    ) -> tuple[int, bytearray, bytearray]:
+        """
+        Read the call's FIFOs to EOF and its exit code from the shell.
+
+        Our write ends (`holders`) are closed and the list emptied once
+        the exit code arrives; after that EOF means the script and
+        anything it left running have all finished writing.
+        """
+        assert self.process.stdout is not None
+        ctl_fd = self.process.stdout.fileno()
+        bufs = {out_fd: bytearray(), err_fd: bytearray()}
+        ctl = bytearray()
+        code = 0
+        pending = {ctl_fd, out_fd, err_fd}
+        deadline = time.monotonic() + timeout
+
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.kill()
+                raise subprocess.TimeoutExpired(script, timeout)
+
+            ready, _, _ = select.select(list(pending), [], [], remaining)
+            for fd in ready:
+                chunk = os.read(fd, 65536)
+
+                if fd == ctl_fd:
+                    if not chunk:
+                        self.kill()
+                        raise RuntimeError("Shell session exited unexpectedly")
+                    ctl += chunk
+                    if ctl.endswith(self._end):
+                        # <<<RC_token:N<<<END_token>>>\n
+                        code = int(ctl[len(self._rc_prefix):-len(self._end)])
+                        pending.discard(ctl_fd)
+                        while holders:
+                            os.close(holders.pop())
+                elif not chunk:
+                    pending.discard(fd)  # every writer has closed it
+                else:
+                    bufs[fd] += chunk
+                    if len(bufs[fd]) > self.max_output_bytes:
+                        self.kill()
+                        raise OutputLimitExceeded(
+                            f"output exceeded {self.max_output_bytes} bytes"
+                        )
+
+        return code, bufs[out_fd], bufs[err_fd]
+
+    def kill(self):
+        """Stop the shell and anything it started."""
+        if self.alive():
+            try:
+                os.killpg(self.process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        self.process.wait()
+        shutil.rmtree(self._fifo_dir, ignore_errors=True)
@@ -0,0 +1,453 @@
+"""
+Python Worker Pool — keeps Python interpreters warm for skill scripts.
+
+Starting a fresh `python` for every run.py costs 50-100 ms before the
+skill does any work (interpreter startup + imports). Instead, we keep a
+few worker processes alive. Each worker runs run.py much like
+`python run.py` would (parameters as JSON on stdin, result on stdout),
+but third-party modules it imports stay loaded for the next call.
+
+Keeping a run from affecting the next one:
+- A worker only ever runs one script. Skills never share an interpreter.
+- The skill's own modules (those in its folder), sys.path and
+  os.environ are put back as they were after every run.
+- The script's stdout/stderr are real file descriptors pointing at
+  fresh per-run files, so output from child processes is captured too,
+  and a background child that keeps writing can't reach the next run.
+
+Protocol (over the worker's stdin/stdout, which the script never sees):
+    parent → worker:  <<<START>>>{json request}<<<END>>>  then the raw stdin bytes
+    worker → parent:  <<<START_OUTPUT>>>{json reply}<<<END_EXECUTION>>>
+
+The request says how many stdin bytes follow, so the skill's parameters
+are passed through untouched instead of being JSON-escaped a second time.
+It also carries the output cap: once the script itself prints more than
+that, the worker stops it and replies with "overflow". Output from
+child processes is checked by the parent while it waits.
+"""
+
+import atexit
+import json
+import os
+import select
+import shutil
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+from collections import deque
+
+from agent.skills.sandbox import MAX_OUTPUT_BYTES, SANDBOX_PATH, OutputLimitExceeded
+
+# How often (seconds) to check the output size while a script runs
+_OUTPUT_CHECK_INTERVAL = 0.05
+
+START = b"<<<START>>>"
+END = b"<<<END>>>"
+START_OUTPUT = b"<<<START_OUTPUT>>>"
+END_EXECUTION = b"<<<END_EXECUTION>>>\n"
+
+# The program each worker runs: read a request, run the script, reply
+_BOOTSTRAP = r'''
+import io, json, os, runpy, sys, traceback
+
+# Keep the protocol pipes for ourselves; the script gets /dev/null on
+# fd 0 and per-run files on fds 1 and 2
+control_in = os.fdopen(os.dup(0), "rb")
+control_out = os.fdopen(os.dup(1), "wb")
+devnull = os.open(os.devnull, os.O_RDWR)
+for fd in (0, 1, 2):
+    os.dup2(devnull, fd)
+
+
+class OutputLimit(BaseException):
+    """Raised inside the script when it prints too much."""
+
+
+class CappedFD(io.RawIOBase):
+    """Writes straight to a file descriptor, refusing to go past `cap` bytes."""
+
+    def __init__(self, fd, cap):
+        self.fd, self.cap, self.size = fd, cap, 0
+
+    def writable(self):
+        return True
+
+    def fileno(self):
+        return self.fd
+
+    def write(self, b):
+        self.size += len(b)
+        if self.size > self.cap:
+            raise OutputLimit()
+        view = memoryview(b)
+        while view:
+            view = view[os.write(self.fd, view):]
+        return len(b)
+
+
+def text_stream(fd, cap):
+    raw = CappedFD(fd, cap)
+    return io.TextIOWrapper(raw, encoding="utf-8", errors="backslashreplace", write_through=True)
+
+
+def run(request, stdin_bytes):
+    """Run one script; return (exit code, overflowed?)."""
+    script = request["script"]
+    skill_dir = os.path.dirname(script) + os.sep
+    saved_path, saved_environ = sys.path[:], os.environ.copy()
+    saved_modules = set(sys.modules)
+
+    for fd, path in ((1, request["stdout"]), (2, request["stderr"])):
+        target = os.open(path, os.O_WRONLY)
+        os.dup2(target, fd)
+        os.close(target)
+    out = text_stream(1, request["max_output"])
+    err = text_stream(2, request["max_output"])
+    sys.stdin = io.TextIOWrapper(io.BytesIO(stdin_bytes), encoding="utf-8")
+    sys.stdout, sys.stderr = out, err
+    sys.argv = [script]
+    sys.path.insert(0, os.path.dirname(script))
+    os.environ["HOME"] = request["home"]
+
+    code, overflow = 0, False
+    try:
+        os.chdir(request["cwd"])
+        runpy.run_path(script, run_name="__main__")
+    except SystemExit as e:
+        if e.code is None:
+            code = 0
+        elif isinstance(e.code, int):
+            code = e.code
+        else:
+            code = 1
+            try:
+                print(e.code, file=err)
+            except OutputLimit:
+                overflow = True
+    except OutputLimit:
+        code, overflow = 1, True
+    except BaseException as e:
+        code = 1
+        # Start the traceback at the script, not in this bootstrap or runpy
+        # (None for a SyntaxError, which then prints just like python does)
+        tb = e.__traceback__
+        while tb is not None and tb.tb_frame.f_code.co_filename != script:
+            tb = tb.tb_next
+        try:
+            traceback.print_exception(type(e), e, tb, file=err)
+        except OutputLimit:
+            overflow = True
+    finally:
+        for stream in (out, err):
+            try:
+                stream.flush()
+            except (OutputLimit, ValueError):
+                pass
+        sys.stdin, sys.stdout, sys.stderr = sys.__stdin__, sys.__stdout__, sys.__stderr__
+        for fd in (1, 2):
+            os.dup2(devnull, fd)
+
+        # Put back what the script may have changed
+        sys.path[:] = saved_path
+        os.environ.clear()
+        os.environ.update(saved_environ)
+        for name in set(sys.modules) - saved_modules:
+            module_file = getattr(sys.modules[name], "__file__", None) or ""
+            if module_file.startswith(skill_dir):
+                del sys.modules[name]
+
+    return code, overflow
+
+
+for line in control_in:
+    line = line.strip()
+    if not (line.startswith(b"<<<START>>>") and line.endswith(b"<<<END>>>")):
+        continue
+    request = json.loads(line[len(b"<<<START>>>"):-len(b"<<<END>>>")])
+    code, overflow = run(request, control_in.read(request["input_len"]))
+
+    reply = json.dumps({"code": code, "overflow": overflow})
+    control_out.write(b"<<<START_OUTPUT>>>" + reply.encode() + b"<<<END_EXECUTION>>>\n")
+    control_out.flush()
+'''
+
+
+class PythonWorker:
+    """One long-lived Python process that runs a single skill script on request."""
+
+    def __init__(self, script: str):
+        self.script = script
+        self.process = subprocess.Popen(
+            ["python", "-u", "-c", _BOOTSTRAP],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            env={"PATH": SANDBOX_PATH, "HOME": os.getcwd()},
+            start_new_session=True,  # own process group, so kill() gets children too
+        )
+        self.last_used = time.monotonic()
+        # Per-run output files live here; a counter keeps their names unique
+        self._output_dir = tempfile.mkdtemp(prefix="skill-worker-")
+        self._runs = 0
+        self._killed = False
+
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def run(
+        self,
+        cwd: str,
+        stdin: bytes,
+        timeout: float,
+        max_output_bytes: int = MAX_OUTPUT_BYTES,
+        deadline: float | None = None
+    ) -> tuple[int, str, str]:
+        """
+        Run the worker's script once and return (exit_code, stdout, stderr).
+
+        `deadline` (time.monotonic()) defaults to `timeout` from now.
+
+        Raises subprocess.TimeoutExpired if the script runs too long
+        (the worker is killed — it can't be trusted after that), and
+        OutputLimitExceeded if it printed more than `max_output_bytes`.
+        If the script ends the worker itself (os._exit), its exit code
+        and output are still returned.
+        """
+        self._runs += 1
+        paths = [
+            os.path.join(self._output_dir, f"{name}.{self._runs}")
+            for name in ("out", "err")
+        ]
+        fds: list[int] = []
+        try:
+            for path in paths:
+                fds.append(os.open(path, os.O_RDONLY | os.O_CREAT | os.O_EXCL, 0o600))
+
+            request = json.dumps({
+                "script": self.script,
+                "cwd": cwd,
+                "home": cwd,
+                "stdout": paths[0],
+                "stderr": paths[1],
+                "input_len": len(stdin),
+                "max_output": max_output_bytes,
+            })
+            assert self.process.stdin is not None
+            self.process.stdin.write(START + request.encode() + END + b"\n" + stdin)
+            self.process.stdin.flush()
+
+            if deadline is None:
+                deadline = time.monotonic() + timeout
+            code, overflow = self._wait_for_reply(fds, deadline, timeout, max_output_bytes)
+
+            # Read one byte past the cap to tell "exactly full" from "too much"
+            out, err = (os.pread(fd, max_output_bytes + 1, 0) for fd in fds)
+            if overflow or max(len(out), len(err)) > max_output_bytes:
+                raise OutputLimitExceeded(f"output exceeded {max_output_bytes} bytes")
+            return code, out.decode("utf-8", "replace"), err.decode("utf-8", "replace")
+        finally:
+            for fd in fds:
+                os.close(fd)
+            for path in paths:
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass  # never created, or kill() already removed the directory
+
+    def _wait_for_reply(
+        self,
+        fds: list[int],
+        deadline: float,
+        timeout: float,
+        max_output_bytes: int
+    ) -> tuple[int, bool]:
+        """Wait for the worker's reply, watching the clock and the output size."""
+        assert self.process.stdout is not None
+        control_fd = self.process.stdout.fileno()
+        buf = bytearray()
+        while not buf.endswith(END_EXECUTION):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.kill()
+                raise subprocess.TimeoutExpired(self.script, timeout)
+
+            # Child processes write to the output files directly, so
+            # their size is checked here rather than in the worker
+            if any(os.fstat(fd).st_size > max_output_bytes for fd in fds):
+                self.kill()
+                raise OutputLimitExceeded(f"output exceeded {max_output_bytes} bytes")
+
+            ready, _, _ = select.select(
+                [control_fd], [], [], min(remaining, _OUTPUT_CHECK_INTERVAL)
+            )
+            if not ready:
+                continue
+
+            chunk = os.read(control_fd, 65536)
+            if not chunk:
+                # The script ended the worker (e.g. os._exit): report its exit code
+                return self.process.wait(), False
+            buf += chunk
+
+        # <<<START_OUTPUT>>>{json}<<<END_EXECUTION>>>
+        reply = json.loads(buf[buf.index(START_OUTPUT) + len(START_OUTPUT):-len(END_EXECUTION)])
+        return reply["code"], reply["overflow"]
+
+    def kill(self):
+        """Stop the worker and anything its scripts started (safe to call twice)."""
+        if self._killed:
+            return
+        self._killed = True
+        try:
+            os.killpg(self.process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        self.process.wait()
+        shutil.rmtree(self._output_dir, ignore_errors=True)
+
+
+class PythonWorkerPool:
+    """
+    A small, elastic pool of warm Python workers.
+
+    Workers are started on demand (an agent that never runs a script
+    never starts one), up to `size` at a time, each tied to one script.
+    A call reuses an idle worker for its script, or replaces the
+    longest-idle worker of another script once the pool is full; if all
+    workers are busy it waits for one. A janitor thread stops workers
+    that sit idle longer than `idle_ttl` seconds, so a burst of calls
+    doesn't leave interpreters around forever.
+
+    Usage:
+        pool = PythonWorkerPool(size=2, timeout=30)
+        code, out, err = pool.execute("skills/x/run.py", b'{"a":1}', "skills/x")
+    """
+
+    JANITOR_INTERVAL = 5  # seconds between idle-worker sweeps
+
+    def __init__(
+        self,
+        size: int = 2,
+        timeout: float = 30,
+        max_output_bytes: int = MAX_OUTPUT_BYTES,
+        idle_ttl: float = 60
+    ):
+        self.size = size
+        self.timeout = timeout
+        self.max_output_bytes = max_output_bytes
+        self.idle_ttl = idle_ttl
+        self._idle: deque[PythonWorker] = deque()
+        self._busy: set[PythonWorker] = set()
+        self._cond = threading.Condition()
+        self._stopped = threading.Event()
+        self._janitor: threading.Thread | None = None
+
+        atexit.register(self.shutdown)
+
+    def _acquire(self, script: str, deadline: float, timeout: float) -> PythonWorker:
+        """
+        Take an idle worker for `script`, start one if there's room, or wait.
+
+        Waiting counts against the call's timeout: raises
+        subprocess.TimeoutExpired if no worker frees up by `deadline`.
+        """
+        with self._cond:
+            while True:
+                # Most recently used first: least likely to be retired
+                for worker in reversed(self._idle):
+                    if worker.script == script:
+                        self._idle.remove(worker)
+                        if worker.alive():
+                            self._busy.add(worker)
+                            return worker
+                        worker.kill()
+                        break
+                else:
+                    if self._idle and len(self._idle) + len(self._busy) >= self.size:
+                        # Full: make room by retiring the longest-idle worker
+                        self._idle.popleft().kill()
+
+                    if len(self._idle) + len(self._busy) < self.size:
+                        worker = PythonWorker(script)
+                        self._busy.add(worker)
+                        self._start_janitor()
+                        return worker
+
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise subprocess.TimeoutExpired(script, timeout)
+                    self._cond.wait(remaining)
+
+    def _release(self, worker: PythonWorker):
+        """Give a worker back and wake up one waiting caller."""
+        with self._cond:
+            self._busy.discard(worker)
+            keep = worker.alive() and not self._stopped.is_set()
+            if keep:
+                worker.last_used = time.monotonic()
+                self._idle.append(worker)
+            self._cond.notify()
+        if not keep:
+            worker.kill()
+
+    def _start_janitor(self):
+        """Start the idle-worker sweeper (called with the lock held)."""
+        if self._janitor is None:
+            self._janitor = threading.Thread(
+                target=self._sweep_idle, name="python-pool-janitor", daemon=True
+            )
+            self._janitor.start()
+
+    def _sweep_idle(self):
+        """Every few seconds, stop workers that have been idle too long."""
+        while not self._stopped.wait(self.JANITOR_INTERVAL):
+            cutoff = time.monotonic() - self.idle_ttl
+            with self._cond:
+                # Idle workers are in last-used order, oldest first
+                expired = []
+                while self._idle and self._idle[0].last_used < cutoff:
+                    expired.append(self._idle.popleft())
+            for worker in expired:
+                worker.kill()
+
+    def execute(
+        self,
+        script_path: str,
+        stdin: bytes,
+        cwd: str,
+        timeout: float | None = None
+    ) -> tuple[int, str, str]:
+        """
+        Run a skill script on a warm worker: (exit_code, stdout, stderr).
+
+        `stdin` is what the script reads from sys.stdin — for skills,
+        the already-encoded JSON parameters. `timeout` covers the whole
+        call, including any wait for a free worker.
+        """
+        if timeout is None:
+            timeout = self.timeout
+        deadline = time.monotonic() + timeout
+
+        # Workers chdir between runs, so relative paths won't do
+        worker = self._acquire(os.path.abspath(script_path), deadline, timeout)
+        try:
+            return worker.run(
+                os.path.abspath(cwd),
+                stdin,
+                timeout,
+                self.max_output_bytes,
+                deadline,
+            )
+        finally:
+            self._release(worker)
+
+    def shutdown(self):
+        """Stop the janitor and all idle workers (busy ones stop when released)."""
+        self._stopped.set()
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+        for worker in idle:
+            worker.kill()
@@ -0,0 +1,36 @@
+"""Tests for skill discovery in agent/skills/loader.py."""
+
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from agent.skills.loader import SkillRegistry
+
+
+class DiscoverTests(unittest.TestCase):
+
+    def test_each_skill_is_parsed_once(self):
+        """_discover parses every SKILL.md exactly once."""
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in ("alpha", "beta"):
+                skill_dir = Path(tmp) / name
+                skill_dir.mkdir()
+                (skill_dir / "SKILL.md").write_text(
+                    f"---\nname: {name}\ndescription: test\n---\nDo {name}.\n"
+                )
+
+            with mock.patch.object(
+                SkillRegistry,
+                "_parse_skill",
+                autospec=True,
+                side_effect=SkillRegistry._parse_skill,
+            ) as parse:
+                registry = SkillRegistry(Path(tmp))
+
+            self.assertEqual(parse.call_count, 2)
+            self.assertEqual(sorted(registry.registry), ["alpha", "beta"])
+
+
+if __name__ == "__main__":
+    unittest.main()